@@ -2,6 +2,7 @@ __all__ = [
 	"grid",
 	"dynamic",
 	"search",
+	"search_jps",
 	"agent",
 ]
 
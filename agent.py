@@ -6,14 +6,16 @@ from typing import Callable, List, Optional, Tuple
 
 from .grid import Grid, Position
 from . import search as search_mod
+from . import search_jps
 
-SearchFn = Callable[[Grid, Position, Position, int], Optional[List[Position]]]
+SearchFn = Callable[..., Optional[List[Position]]]
 
 
 ALGORITHMS = {
 	"bfs": search_mod.bfs,
 	"ucs": search_mod.ucs,
 	"astar": search_mod.astar,
+	"jps": search_jps.jps,
 }
 
 
@@ -23,6 +25,8 @@ class AgentConfig:
 	hill_climb_attempts: int = 5
 	hill_climb_neighbors: int = 12
 	random_seed: Optional[int] = None
+	# Plan "astar" with JPS; it falls back to A* unless costs are uniform and nothing moves
+	auto: bool = False
 
 
 class DeliveryAgent:
@@ -31,6 +35,13 @@ class DeliveryAgent:
 	Tracks path history and metrics for reporting.
 	"""
 
+	__slots__ = (
+		"grid", "start", "goal", "t", "pos", "config",
+		"_rng", "_plan", "_plan_idx", "_plan_version", "_search", "_h_cache",
+		"total_cost", "steps_taken", "replan_count", "dynamic_conflicts",
+		"path_trace", "last_action", "last_step_cost", "last_reason",
+	)
+
 	def __init__(self, grid: Grid, start: Position, goal: Position, config: Optional[AgentConfig] = None) -> None:
 		self.grid = grid
 		self.start = start
@@ -38,12 +49,19 @@ class DeliveryAgent:
 		self.t = 0
 		self.pos = start
 		self.config = config or AgentConfig()
-		if self.config.random_seed is not None:
-			random.seed(self.config.random_seed)
+		# Private RNG so hill-climb restarts neither touch nor depend on global random state
+		self._rng = random.Random(self.config.random_seed)
+		# Planned positions; _plan[_plan_idx] is the next one to visit
 		self._plan: List[Position] = []
+		self._plan_idx: int = 0
+		# Bumped whenever _plan is replaced, so callers can skip copying an unchanged plan
+		self._plan_version: int = 0
 		if self.config.algo not in ALGORITHMS:
 			raise ValueError(f"Unknown algorithm: {self.config.algo}")
 		self._search: SearchFn = ALGORITHMS[self.config.algo]
+		if self.config.auto and self.config.algo == "astar":
+			self._search = search_jps.jps
+		self._h_cache: search_mod.HeuristicCache = search_mod.heuristic_table(grid, goal)
 		# Metrics
 		self.total_cost: int = 0
 		self.steps_taken: int = 0
@@ -55,18 +73,37 @@ class DeliveryAgent:
 		self.last_reason: str = ""
 
 	def planned_path(self) -> List[Position]:
-		return list(self._plan)
+		return self._plan[self._plan_idx:]
+
+	@property
+	def plan_version(self) -> int:
+		return self._plan_version
+
+	def remaining_plan_length(self) -> int:
+		return len(self._plan) - self._plan_idx
 
 	def at_goal(self) -> bool:
 		return self.pos == self.goal
 
+	def set_goal(self, goal: Position) -> None:
+		"""Change the goal, dropping the current plan and rebuilding the heuristic table."""
+		self.goal = goal
+		self._plan = []
+		self._plan_idx = 0
+		self._plan_version += 1
+		self._h_cache = search_mod.heuristic_table(self.grid, goal)
+
 	def plan(self) -> bool:
-		path = self._search(self.grid, self.pos, self.goal, self.t)
+		path = self._search(self.grid, self.pos, self.goal, self.t, h_cache=self._h_cache)
 		if path is None or not path:
 			self._plan = []
+			self._plan_idx = 0
+			self._plan_version += 1
 			return False
-		# The returned path includes current position as first node; drop it for next steps
-		self._plan = path[1:]
+		# The returned path includes current position as first node; skip it for next steps
+		self._plan = path
+		self._plan_idx = 1
+		self._plan_version += 1
 		return True
 
 	def step(self) -> bool:
@@ -74,13 +111,13 @@ class DeliveryAgent:
 		if self.at_goal():
 			return True
 		# Ensure plan exists and remains valid for next step
-		if not self._plan:
+		if self._plan_idx >= len(self._plan):
 			if not self.plan():
 				self.last_action = "stuck"
 				self.last_reason = "no_initial_plan"
 				return False
 		replan_triggered = False
-		next_pos = self._plan[0]
+		next_pos = self._plan[self._plan_idx]
 		next_t = self.t + 1
 		# Treat dynamic obstacles as walls: if conflict now or at next tick -> replan
 		if self.grid.is_blocked(next_pos, next_t) or self.grid.is_dynamic_blocked(next_pos, self.t):
@@ -98,7 +135,7 @@ class DeliveryAgent:
 				self.last_reason = "conflict_fallback_hill"
 				return True
 			# After replanning, reassess next step
-			next_pos = self._plan[0] if self._plan else self.pos
+			next_pos = self._plan[self._plan_idx] if self._plan_idx < len(self._plan) else self.pos
 			next_t = self.t + 1
 			if self.grid.is_blocked(next_pos, next_t) or self.grid.is_dynamic_blocked(next_pos, self.t):
 				# Still blocked, try local hill climb once
@@ -120,8 +157,8 @@ class DeliveryAgent:
 		self.last_action = "wait" if next_pos == self.pos else "move"
 		self.last_reason = "replan" if replan_triggered else "plan"
 		# Drop the step just executed
-		if self._plan and self._plan[0] == self.pos:
-			self._plan.pop(0)
+		if self._plan_idx < len(self._plan) and self._plan[self._plan_idx] == self.pos:
+			self._plan_idx += 1
 		return True
 
 	def _local_hill_climb_move(self) -> bool:
@@ -134,32 +171,31 @@ class DeliveryAgent:
 		no feasible improvement is found.
 		"""
 		attempts = max(1, self.config.hill_climb_attempts)
-		for _ in range(attempts):
-			candidates: List[Position] = []
-			next_t = self.t + 1
-			# Consider waiting
-			if not self.grid.is_blocked(self.pos, next_t) and not self.grid.is_dynamic_blocked(self.pos, self.t):
-				candidates.append(self.pos)
-			# Consider moving
-			for npos in self.grid.neighbors(self.pos, next_t):
-				# Avoid swap collisions: skip if occupied now
-				if self.grid.is_dynamic_blocked(npos, self.t):
-					continue
-				candidates.append(npos)
-			if not candidates:
+		# Candidates depend only on (pos, t); restarts just reshuffle them
+		candidates: List[Position] = []
+		next_t = self.t + 1
+		# Consider waiting
+		if not self.grid.is_blocked(self.pos, next_t) and not self.grid.is_dynamic_blocked(self.pos, self.t):
+			candidates.append(self.pos)
+		# Consider moving
+		for npos in self.grid.neighbors(self.pos, next_t):
+			# Avoid swap collisions: skip if occupied now
+			if self.grid.is_dynamic_blocked(npos, self.t):
 				continue
-			random.shuffle(candidates)
-			best_pos: Optional[Position] = None
-			best_score = float("inf")
-			for cand in candidates[: self.config.hill_climb_neighbors]:
-				# Score: entering cost for move (1 if waiting) + heuristic to goal
-				move_cost = 1 if cand == self.pos else self.grid.get_cost(cand)
-				score = move_cost + search_mod.manhattan(cand, self.goal)
-				if score < best_score:
-					best_score = score
-					best_pos = cand
-			if best_pos is None:
+			candidates.append(npos)
+		if not candidates:
+			return False
+		pos = self.pos
+		get_cost = self.grid.get_cost
+		gx, gy = self.goal
+		for _ in range(attempts):
+			order = candidates[:]
+			self._rng.shuffle(order)
+			order = order[: self.config.hill_climb_neighbors]
+			if not order:
 				continue
+			# Score: entering cost for move (1 if waiting) + heuristic to goal; first minimum wins
+			best_pos = min(order, key=lambda c: (1 if c == pos else get_cost(c)) + abs(c[0] - gx) + abs(c[1] - gy))
 			# Execute chosen local move
 			move_cost = 1 if best_pos == self.pos else self.grid.get_cost(best_pos)
 			self.pos = best_pos
@@ -172,5 +208,7 @@ class DeliveryAgent:
 			self.last_reason = "hill"
 			# Invalidate current plan; require replan from new state
 			self._plan = []
+			self._plan_idx = 0
+			self._plan_version += 1
 			return True
 		return False
@@ -15,17 +15,24 @@ class MovingObstacle:
 	path: Sequence[Position]
 	cycle: bool = True
 
+	def __post_init__(self) -> None:
+		self._path: Tuple[Position, ...] = tuple(self.path)
+		self._n = len(self._path)
+
+	@property
+	def path_tuple(self) -> Tuple[Position, ...]:
+		"""Immutable snapshot of `path` taken at construction."""
+		return self._path
+
 	def position_at(self, t: int) -> Position:
-		if not self.path:
+		n = self._n
+		if not n:
 			raise ValueError("MovingObstacle requires a non-empty path")
 		if t < 0:
 			raise ValueError("t must be non-negative")
 		if self.cycle:
-			idx = t % len(self.path)
-			return self.path[idx]
-		else:
-			idx = min(t, len(self.path) - 1)
-			return self.path[idx]
+			return self._path[t % n]
+		return self._path[t if t < n else n - 1]
 
 	def occupies(self, pos: Position, t: int) -> bool:
-		return self.position_at(t) == pos 
\ No newline at end of file
+		return self.position_at(t) == pos
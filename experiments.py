@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import time
 import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import Dict, List, Tuple
 
 from delivery.grid import Grid, Position
@@ -16,30 +18,24 @@ ALGOS = [
 
 
 def make_grid(width: int, height: int, seed: int) -> Grid:
-	random.seed(seed)
+	rng = random.Random(seed)
 	g = Grid(width, height, default_cost=1)
-	for y in range(height):
-		for x in range(width):
-			g.set_cost((x, y), random.randint(1, 5))
-	# ~10% walls
-	walls = []
-	for y in range(height):
-		for x in range(width):
-			if random.random() < 0.10:
-				walls.append((x, y))
-	g.set_static_obstacles(walls)
+	n = width * height
+	# Row-major terrain costs 1..5 and ~10% walls, filled in bulk
+	g.set_costs_bulk(rng.choices(range(1, 6), k=n))
+	g.set_static_obstacles_mask([rng.random() < 0.10 for _ in range(n)])
 	# add some dynamic obstacles
 	num_dyn = max(1, (width * height) // 60)
 	for _ in range(num_dyn):
-		if random.random() < 0.5:
-			y = random.randint(0, height - 1)
+		if rng.random() < 0.5:
+			y = rng.randint(0, height - 1)
 			path = [(x, y) for x in range(width)]
-			if random.random() < 0.5:
+			if rng.random() < 0.5:
 				path.reverse()
 		else:
-			x = random.randint(0, width - 1)
+			x = rng.randint(0, width - 1)
 			path = [(x, y) for y in range(height)]
-			if random.random() < 0.5:
+			if rng.random() < 0.5:
 				path.reverse()
 		g.add_dynamic_obstacle(MovingObstacle(path=path, cycle=True))
 	return g
@@ -81,8 +77,10 @@ def main() -> None:
 	width, height = 20, 12
 	seeds = [3, 5, 7, 11, 13]
 	rows: List[Dict[str, float]] = []
-	for s in seeds:
-		rows.extend(run_once(width, height, s))
+	# Seeds are independent; run them in worker processes
+	with ProcessPoolExecutor() as ex:
+		for seed_rows in ex.map(partial(run_once, width, height), seeds):
+			rows.extend(seed_rows)
 	# Aggregate by algo
 	summary: Dict[str, Dict[str, float]] = {}
 	for r in rows:
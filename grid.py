@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import math
+from array import array
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Set, Tuple
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 Position = Tuple[int, int]
 
+# Upper bound on the number of precomputed dynamic occupancy time slices
+DYNAMIC_TABLE_LIMIT = 10000
+
+# 4-neighborhood offsets, in expansion order
+NEIGHBOR_OFFSETS: Tuple[Position, ...] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
 
 @dataclass(frozen=True)
 class Bounds:
@@ -30,11 +38,26 @@ class Grid:
 		if default_cost < 1:
 			raise ValueError("default_cost must be >= 1")
 		self.bounds = Bounds(width, height)
-		self._terrain: List[List[int]] = [
-			[default_cost for _ in range(width)] for _ in range(height)
-		]
+		# Row-major terrain costs, indexed by y * width + x
+		self._terrain = array("i", [default_cost]) * (width * height)
+		self._default_cost = default_cost
+		self._uniform_cost = True
 		self._static_blocked: Set[Position] = set()
+		# Bitset mirror of _static_blocked, bit (y * width + x) set when blocked
+		self._blocked_bits = bytearray((width * height + 7) // 8)
 		self._dynamic_obstacles: List["DynamicObstacle"] = []
+		# Lazily built occupancy table: one set of occupied cells per time slice.
+		# Slices [0, offset) cover non-cycling warm-up, then repeat every `period`.
+		self._dyn_occ: Optional[List[Set[Position]]] = None
+		self._dyn_offset: int = 0
+		self._dyn_period: int = 1
+		self._dyn_untabled: List["DynamicObstacle"] = []
+		# Unpacked per-cell views for array-based search (see `to_arrays`, `open_neighbors`, `dynamic_mask`)
+		self._wall_mask: Optional[bytearray] = None
+		self._open_neighbors: Optional[List[Tuple[int, ...]]] = None
+		self._dyn_masks: Dict[int, bytearray] = {}
+		# Per slice index of t: cells occupied at t or t + 1 (see `swap_mask`)
+		self._swap_masks: Dict[int, bytearray] = {}
 
 	@property
 	def width(self) -> int:
@@ -44,25 +67,63 @@ class Grid:
 	def height(self) -> int:
 		return self.bounds.height
 
+	@property
+	def is_uniform_cost(self) -> bool:
+		"""True while no cell has been given a cost other than the default."""
+		return self._uniform_cost
+
+	@property
+	def has_dynamic_obstacles(self) -> bool:
+		return bool(self._dynamic_obstacles)
+
 	def set_cost(self, pos: Position, cost: int) -> None:
 		if cost < 1:
 			raise ValueError("Cell cost must be >= 1")
 		if not self.bounds.in_bounds(pos):
 			raise ValueError("Position out of bounds")
 		x, y = pos
-		self._terrain[y][x] = cost
+		self._terrain[y * self.bounds.width + x] = cost
+		if cost != self._default_cost:
+			self._uniform_cost = False
+
+	def set_costs_bulk(self, costs: Sequence[int]) -> None:
+		"""Replace all terrain costs from a row-major sequence of width * height values."""
+		if len(costs) != len(self._terrain):
+			raise ValueError("Expected one cost per cell")
+		terrain = array("i", costs)
+		if min(terrain) < 1:
+			raise ValueError("Cell cost must be >= 1")
+		self._terrain = terrain
+		self._uniform_cost = min(terrain) == max(terrain) == self._default_cost
 
 	def get_cost(self, pos: Position) -> int:
-		if not self.bounds.in_bounds(pos):
-			raise ValueError("Position out of bounds")
 		x, y = pos
-		return self._terrain[y][x]
+		width = self.bounds.width
+		if 0 <= x < width and 0 <= y < self.bounds.height:
+			return self._terrain[y * width + x]
+		raise ValueError("Position out of bounds")
 
 	def set_static_obstacles(self, obstacles: Iterable[Position]) -> None:
-		for pos in obstacles:
+		blocked = set(obstacles)
+		for pos in blocked:
 			if not self.bounds.in_bounds(pos):
 				raise ValueError(f"Static obstacle {pos} out of bounds")
-		self._static_blocked = set(obstacles)
+		width = self.bounds.width
+		bits = bytearray(len(self._blocked_bits))
+		for x, y in blocked:
+			i = y * width + x
+			bits[i >> 3] |= 1 << (i & 7)
+		self._static_blocked = blocked
+		self._blocked_bits = bits
+		self._wall_mask = None
+		self._open_neighbors = None
+
+	def set_static_obstacles_mask(self, mask: Sequence[bool]) -> None:
+		"""Replace static obstacles from a row-major sequence of width * height flags."""
+		if len(mask) != len(self._terrain):
+			raise ValueError("Expected one flag per cell")
+		width = self.bounds.width
+		self.set_static_obstacles((i % width, i // width) for i, blocked in enumerate(mask) if blocked)
 
 	def get_static_obstacles(self) -> Set[Position]:
 		return set(self._static_blocked)
@@ -71,59 +132,270 @@ class Grid:
 		if not self.bounds.in_bounds(pos):
 			raise ValueError("Position out of bounds")
 		self._static_blocked.add(pos)
+		i = pos[1] * self.bounds.width + pos[0]
+		self._blocked_bits[i >> 3] |= 1 << (i & 7)
+		self._wall_mask = None
+		self._open_neighbors = None
 
 	def remove_static_obstacle(self, pos: Position) -> None:
-		self._static_blocked.discard(pos)
+		if pos in self._static_blocked:
+			self._static_blocked.discard(pos)
+			i = pos[1] * self.bounds.width + pos[0]
+			self._blocked_bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+			self._wall_mask = None
+			self._open_neighbors = None
 
 	def add_dynamic_obstacle(self, obstacle: "DynamicObstacle") -> None:
 		self._dynamic_obstacles.append(obstacle)
+		self._dyn_occ = None
+
+	def _build_dynamic_occupancy(self) -> List[Set[Position]]:
+		"""Precompute per-time occupancy for path-following obstacles.
+
+		Obstacles without a `path` (or whose table would exceed DYNAMIC_TABLE_LIMIT)
+		are kept aside and queried through `occupies`.
+		"""
+		tabled = []
+		untabled: List["DynamicObstacle"] = []
+		for obs in self._dynamic_obstacles:
+			path = getattr(obs, "path_tuple", None) or getattr(obs, "path", None)
+			if path:
+				tabled.append((tuple(path), bool(getattr(obs, "cycle", True))))
+			else:
+				untabled.append(obs)
+		offset = max((len(path) - 1 for path, cycle in tabled if not cycle), default=0)
+		period = math.lcm(*(len(path) for path, cycle in tabled if cycle))
+		if offset + period > DYNAMIC_TABLE_LIMIT:
+			tabled = []
+			untabled = list(self._dynamic_obstacles)
+			offset, period = 0, 1
+		occ: List[Set[Position]] = [set() for _ in range(offset + period)]
+		for t, cells in enumerate(occ):
+			for path, cycle in tabled:
+				n = len(path)
+				cells.add(path[t % n] if cycle else path[min(t, n - 1)])
+		self._dyn_offset = offset
+		self._dyn_period = period
+		self._dyn_untabled = untabled
+		self._dyn_occ = occ
+		self._dyn_masks = {}
+		self._swap_masks = {}
+		return occ
 
 	def is_static_blocked(self, pos: Position) -> bool:
-		return pos in self._static_blocked
+		x, y = pos
+		width = self.bounds.width
+		if 0 <= x < width and 0 <= y < self.bounds.height:
+			i = y * width + x
+			return bool((self._blocked_bits[i >> 3] >> (i & 7)) & 1)
+		return False
+
+	def _slice_index(self, t: int) -> int:
+		"""Index into the occupancy table for time t, building the table if needed."""
+		if self._dyn_occ is None:
+			self._build_dynamic_occupancy()
+		offset = self._dyn_offset
+		return t if t < offset else offset + (t - offset) % self._dyn_period
+
+	def _dynamic_slice(self, t: int) -> Set[Position]:
+		"""Cells occupied at time t by tabled obstacles (see `_build_dynamic_occupancy`)."""
+		idx = self._slice_index(t)
+		return self._dyn_occ[idx]
 
 	def is_dynamic_blocked(self, pos: Position, t: int) -> bool:
-		for obs in self._dynamic_obstacles:
+		if pos in self._dynamic_slice(t):
+			return True
+		for obs in self._dyn_untabled:
 			if obs.occupies(pos, t):
 				return True
 		return False
 
+	def dynamic_cells(self, t: int) -> Set[Position]:
+		"""All cells occupied by dynamic obstacles at time t. Do not mutate the result."""
+		cells = self._dynamic_slice(t)
+		if not self._dyn_untabled:
+			return cells
+		cells = set(cells)
+		for obs in self._dyn_untabled:
+			position_at = getattr(obs, "position_at", None)
+			if position_at is not None:
+				cells.add(position_at(t))
+				continue
+			for y in range(self.height):
+				for x in range(self.width):
+					if obs.occupies((x, y), t):
+						cells.add((x, y))
+		return cells
+
+	def iter_dynamic_positions(self, t: int) -> Iterator[Position]:
+		"""Yield each cell occupied by a dynamic obstacle at time t."""
+		yield from self.dynamic_cells(t)
+
+	def cost_array(self) -> array:
+		"""Flat row-major terrain costs (index y * width + x). Use `set_cost` to modify."""
+		return self._terrain
+
+	def static_bits(self) -> bytearray:
+		"""Static obstacle bitset; bit (y * width + x) is set for walls. Do not mutate."""
+		return self._blocked_bits
+
+	def to_arrays(self) -> Tuple[array, bytearray]:
+		"""Flat row-major (costs, walls) arrays with one entry per cell, for array-based search.
+
+		`walls[y * width + x]` is 1 for static obstacles. Do not mutate either array.
+		"""
+		walls = self._wall_mask
+		if walls is None:
+			bits = self._blocked_bits
+			walls = self._wall_mask = bytearray((bits[i >> 3] >> (i & 7)) & 1 for i in range(len(self._terrain)))
+		return self._terrain, walls
+
+	def open_neighbors(self) -> List[Tuple[int, ...]]:
+		"""Per-cell indices of in-bounds, non-wall neighbors, in `NEIGHBOR_OFFSETS` order. Do not mutate."""
+		table = self._open_neighbors
+		if table is None:
+			width = self.bounds.width
+			height = self.bounds.height
+			_, walls = self.to_arrays()
+			table = []
+			for y in range(height):
+				for x in range(width):
+					nbrs = []
+					for dx, dy in NEIGHBOR_OFFSETS:
+						nx = x + dx
+						ny = y + dy
+						if 0 <= nx < width and 0 <= ny < height and not walls[ny * width + nx]:
+							nbrs.append(ny * width + nx)
+					table.append(tuple(nbrs))
+			self._open_neighbors = table
+		return table
+
+	def dynamic_mask(self, t: int) -> bytearray:
+		"""Per-cell dynamic occupancy at time t (1 where an obstacle is). Do not mutate."""
+		idx = self._slice_index(t)
+		mask = None if self._dyn_untabled else self._dyn_masks.get(idx)
+		if mask is None:
+			width = self.bounds.width
+			mask = bytearray(len(self._terrain))
+			for x, y in self.dynamic_cells(t):
+				mask[y * width + x] = 1
+			if not self._dyn_untabled:
+				self._dyn_masks[idx] = mask
+		return mask
+
+	def swap_mask(self, t: int) -> bytearray:
+		"""Per-cell flags for cells occupied at time t or t + 1: the cells a move from t may not enter
+		without running into or swapping with an obstacle. Do not mutate."""
+		idx = self._slice_index(t)
+		mask = None if self._dyn_untabled else self._swap_masks.get(idx)
+		if mask is None:
+			now = self.dynamic_mask(t)
+			nxt = self.dynamic_mask(t + 1)
+			mask = bytearray((int.from_bytes(now, "little") | int.from_bytes(nxt, "little")).to_bytes(len(now), "little"))
+			if not self._dyn_untabled:
+				self._swap_masks[idx] = mask
+		return mask
+
+	def _timeline(self, mask_at: Callable[[int], bytearray], t0: int, horizon: int) -> List[bytearray]:
+		"""`[mask_at(t) for t in range(t0, t0 + horizon)]` for masks that follow the occupancy slices."""
+		self._slice_index(t0)  # builds the occupancy table
+		if self._dyn_untabled:
+			return [mask_at(t) for t in range(t0, t0 + horizon)]
+		end = t0 + horizon
+		# Warm-up slices one by one, then repeat a single period of masks to fill the horizon
+		split = min(max(t0, self._dyn_offset), end)
+		timeline = [mask_at(t) for t in range(t0, split)]
+		rest = end - split
+		if rest > 0:
+			cycle = [mask_at(t) for t in range(split, split + min(self._dyn_period, rest))]
+			reps, extra = divmod(rest, len(cycle))
+			timeline += cycle * reps + cycle[:extra]
+		return timeline
+
+	def build_occupancy(self, t0: int, horizon: int) -> List[bytearray]:
+		"""Dynamic occupancy timeline: entry k is `dynamic_mask(t0 + k)`, for k in [0, horizon).
+
+		Periodic slices share one mask object, so long horizons cost one reference per step.
+		"""
+		return self._timeline(self.dynamic_mask, t0, horizon)
+
+	def build_merged_occupancy(self, t0: int, horizon: int) -> List[bytearray]:
+		"""Like `build_occupancy`, but entry k is `swap_mask(t0 + k)`."""
+		return self._timeline(self.swap_mask, t0, horizon)
+
+	def blocked_mask_at(self, t: int) -> FrozenSet[Position]:
+		"""All cells blocked at time t (walls and dynamic obstacles), built on each call."""
+		return frozenset(self._static_blocked | self.dynamic_cells(t))
+
 	def is_blocked(self, pos: Position, t: int) -> bool:
-		return self.is_static_blocked(pos) or self.is_dynamic_blocked(pos, t)
+		idx = self._slice_index(t)
+		if self._dyn_untabled:
+			return self.is_static_blocked(pos) or self.is_dynamic_blocked(pos, t)
+		# Wall bit first, then the shared occupancy slice; no per-slice copy of the walls
+		x, y = pos
+		width = self.bounds.width
+		if 0 <= x < width and 0 <= y < self.bounds.height:
+			i = y * width + x
+			if (self._blocked_bits[i >> 3] >> (i & 7)) & 1:
+				return True
+		return pos in self._dyn_occ[idx]
 
 	def neighbors(self, pos: Position, t_next: int) -> List[Position]:
 		"""4-neighborhood; returns positions passable at time t_next."""
+		width = self.bounds.width
+		height = self.bounds.height
+		bits = self._blocked_bits
+		dyn = self._dynamic_slice(t_next)
+		untabled = self._dyn_untabled
 		x, y = pos
-		candidates = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
 		result: List[Position] = []
-		for nx, ny in candidates:
-			if not self.bounds.in_bounds((nx, ny)):
-				continue
-			if not self.is_blocked((nx, ny), t_next):
-				result.append((nx, ny))
+		for dx, dy in NEIGHBOR_OFFSETS:
+			nx = x + dx
+			ny = y + dy
+			if 0 <= nx < width and 0 <= ny < height:
+				i = ny * width + nx
+				if (bits[i >> 3] >> (i & 7)) & 1:
+					continue
+				npos = (nx, ny)
+				if npos in dyn:
+					continue
+				if untabled and any(obs.occupies(npos, t_next) for obs in untabled):
+					continue
+				result.append(npos)
 		return result
 
-	def render(self, agent: Optional[Position], goal: Optional[Position], t: int) -> str:
-		"""Return a simple ASCII rendering of the grid at time t."""
-		lines: List[str] = []
+	def render_base(self, goal: Optional[Position]) -> List[bytearray]:
+		"""ASCII rows of the parts of `render` that do not change over time: walls, costs and the goal."""
+		width = self.bounds.width
+		terrain = self._terrain
+		bits = self._blocked_bits
+		rows: List[bytearray] = []
 		for y in range(self.height):
-			row_chars: List[str] = []
-			for x in range(self.width):
-				pos = (x, y)
-				ch = "."
-				if self.is_static_blocked(pos):
-					ch = "#"
-				elif self.is_dynamic_blocked(pos, t):
-					ch = "X"
-				else:
-					cost = self.get_cost(pos)
-					ch = str(min(cost, 9))
-				if goal is not None and pos == goal:
-					ch = "G"
-				if agent is not None and pos == agent:
-					ch = "A"
-				row_chars.append(ch)
-			lines.append("".join(row_chars))
-		return "\n".join(lines)
+			row = bytearray(width)
+			for x in range(width):
+				i = y * width + x
+				row[x] = 35 if (bits[i >> 3] >> (i & 7)) & 1 else 48 + min(terrain[i], 9)  # "#" or digit
+			rows.append(row)
+		if goal is not None and self.bounds.in_bounds(goal):
+			rows[goal[1]][goal[0]] = 71  # "G"
+		return rows
+
+	def render(self, agent: Optional[Position], goal: Optional[Position], t: int, base: Optional[List[bytearray]] = None) -> str:
+		"""Return a simple ASCII rendering of the grid at time t.
+
+		`base` may be a `render_base(goal)` result cached by the caller; it is not modified.
+		"""
+		if base is None:
+			base = self.render_base(goal)
+		rows = [bytearray(row) for row in base]
+		for pos in self.dynamic_cells(t):
+			x, y = pos
+			# Walls and the goal are drawn over dynamic obstacles
+			if self.bounds.in_bounds(pos) and rows[y][x] != 35 and pos != goal:
+				rows[y][x] = 88  # "X"
+		if agent is not None and self.bounds.in_bounds(agent):
+			rows[agent[1]][agent[0]] = 65  # "A"
+		return "\n".join(row.decode("ascii") for row in rows)
 
 
 class DynamicObstacle:
@@ -17,6 +17,9 @@ MODE_SET_GOAL = "Set Goal"
 MODE_SET_START = "Set Start"
 MODE_TOGGLE_WALL = "Toggle Wall"
 
+# Cell fill by terrain cost 1..9 (higher costs share the last shade): lighter is cheaper
+_COST_COLORS = tuple(f"#{b:02x}{b:02x}{b:02x}" for b in (max(30, 240 - (c - 1) * 40) for c in range(1, 10)))
+
 
 class SimulatorGUI:
 	def __init__(self, root: tk.Tk) -> None:
@@ -37,7 +40,11 @@ class SimulatorGUI:
 		self.start: Optional[Position] = None
 		self.running = False
 		self.after_id: Optional[str] = None
+		# Remaining plan as of the agent's plan version `_last_plan_version`
 		self._last_planned_path: List[Position] = []
+		self._last_plan_version = -1
+		# Canvas rectangle ids of the static cells, indexed [y][x]
+		self._cell_ids: List[List[int]] = []
 
 		self._build_ui()
 		self._new_world()
@@ -54,7 +61,7 @@ class SimulatorGUI:
 
 		# Algorithm dropdown
 		ttk.Label(top, text="Algorithm").pack(side=tk.LEFT)
-		algo_cb = ttk.Combobox(top, textvariable=self.algo_var, values=["bfs", "ucs", "astar"], state="readonly", width=8)
+		algo_cb = ttk.Combobox(top, textvariable=self.algo_var, values=["bfs", "ucs", "astar", "jps"], state="readonly", width=8)
 		algo_cb.pack(side=tk.LEFT, padx=(0, 12))
 
 		# Speed
@@ -144,7 +151,7 @@ class SimulatorGUI:
 			return
 		self.agent = DeliveryAgent(self.grid, self.start, self.goal, AgentConfig(algo=self.algo_var.get(), random_seed=int(self.seed_var.get())))
 		self.agent.plan()
-		self._last_planned_path = self.agent.planned_path()
+		self._sync_planned_path(force=True)
 		self._draw()
 
 	def _pause_loop(self) -> None:
@@ -174,44 +181,54 @@ class SimulatorGUI:
 			messagebox.showinfo("Done", "Agent reached goal!")
 			return
 		ok = self.agent.step()
-		if not self.agent.planned_path():
+		if not self.agent.remaining_plan_length():
 			self.agent.plan()
-		self._last_planned_path = self.agent.planned_path()
+		self._sync_planned_path()
 		self._draw()
 		if not ok:
 			self._pause_loop()
 			messagebox.showwarning("Stuck", "Agent got stuck (no feasible move).")
 
+	def _sync_planned_path(self, force: bool = False) -> None:
+		"""Snapshot the agent's remaining plan, but only when the plan was replaced."""
+		if self.agent is None:
+			self._last_planned_path = []
+			self._last_plan_version = -1
+			return
+		if force or self.agent.plan_version != self._last_plan_version:
+			self._last_planned_path = self.agent.planned_path()
+			self._last_plan_version = self.agent.plan_version
+
 	def _new_world(self) -> None:
 		width = max(4, int(self.width_var.get()))
 		height = max(4, int(self.height_var.get()))
 		seed = int(self.seed_var.get())
-		random.seed(seed)
+		rng = random.Random(seed)
 
 		self.grid = Grid(width, height, default_cost=1)
 		# Random terrain costs 1..5
 		for y in range(height):
 			for x in range(width):
-				self.grid.set_cost((x, y), random.randint(1, 5))
+				self.grid.set_cost((x, y), rng.randint(1, 5))
 		# Static obstacles ~10%
 		static: List[Position] = []
 		for y in range(height):
 			for x in range(width):
-				if random.random() < 0.10:
+				if rng.random() < 0.10:
 					static.append((x, y))
 		self.grid.set_static_obstacles(static)
 		# Dynamic obstacles: a few patrols
 		num_dyn = max(1, (width * height) // 60)
 		for i in range(num_dyn):
-			if random.random() < 0.5:
-				y = random.randint(0, height - 1)
+			if rng.random() < 0.5:
+				y = rng.randint(0, height - 1)
 				path = [(x, y) for x in range(width)]
-				if random.random() < 0.5:
+				if rng.random() < 0.5:
 					path.reverse()
 			else:
-				x = random.randint(0, width - 1)
+				x = rng.randint(0, width - 1)
 				path = [(x, y) for y in range(height)]
-				if random.random() < 0.5:
+				if rng.random() < 0.5:
 					path.reverse()
 			self.grid.add_dynamic_obstacle(MovingObstacle(path=path, cycle=True))
 
@@ -228,8 +245,9 @@ class SimulatorGUI:
 		algo = self.algo_var.get()
 		self.agent = DeliveryAgent(self.grid, self.start, self.goal, AgentConfig(algo=algo, random_seed=seed))
 		self.agent.plan()
-		self._last_planned_path = self.agent.planned_path()
+		self._sync_planned_path(force=True)
 		self._resize_canvas()
+		self._build_cells()
 		self._draw()
 
 	def _resize_canvas(self) -> None:
@@ -239,53 +257,63 @@ class SimulatorGUI:
 		h = self.grid.height * CELL_SIZE + 2 * PADDING
 		self.canvas.config(width=w, height=h, scrollregion=(0, 0, w, h))
 
-	def _color_for_cell(self, x: int, y: int) -> str:
-		assert self.grid is not None
-		pos = (x, y)
-		if self.grid.is_static_blocked(pos):
-			return "#000000"  # black walls
-		# Shade by cost: lighter for low cost, darker for high cost
-		cost = self.grid.get_cost(pos)
-		base = max(30, 240 - (cost - 1) * 40)
-		return f"#{base:02x}{base:02x}{base:02x}"
-
-	def _draw(self) -> None:
+	def _build_cells(self) -> None:
+		"""Create the static cell rectangles and cost labels once per world."""
 		self.canvas.delete("all")
+		self._cell_ids = []
 		if self.grid is None:
 			return
-		# Draw grid cells
 		for y in range(self.grid.height):
+			row: List[int] = []
 			for x in range(self.grid.width):
 				x0 = PADDING + x * CELL_SIZE
 				y0 = PADDING + y * CELL_SIZE
 				x1 = x0 + CELL_SIZE
 				y1 = y0 + CELL_SIZE
 				fill = self._color_for_cell(x, y)
-				self.canvas.create_rectangle(x0, y0, x1, y1, fill=fill, outline="#d0d0d0")
+				row.append(self.canvas.create_rectangle(x0, y0, x1, y1, fill=fill, outline="#d0d0d0"))
 				# draw terrain cost number
 				self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text=str(self.grid.get_cost((x, y))), fill="#666", font=("Segoe UI", 8))
+			self._cell_ids.append(row)
+
+	def _refresh_cell(self, x: int, y: int) -> None:
+		self.canvas.itemconfig(self._cell_ids[y][x], fill=self._color_for_cell(x, y))
+
+	def _color_for_cell(self, x: int, y: int) -> str:
+		assert self.grid is not None
+		pos = (x, y)
+		if self.grid.is_static_blocked(pos):
+			return "#000000"  # black walls
+		return _COST_COLORS[min(self.grid.get_cost(pos), 9) - 1]
+
+	def _draw(self) -> None:
+		# Static cells persist between frames; only the "dyn" overlay is redrawn
+		self.canvas.delete("dyn")
+		if self.grid is None:
+			return
 		# Dynamic obstacles at current t
 		if self.agent is not None:
-			t = self.agent.t
-			for y in range(self.grid.height):
-				for x in range(self.grid.width):
-					if self.grid.is_dynamic_blocked((x, y), t):
-						x0 = PADDING + x * CELL_SIZE
-						y0 = PADDING + y * CELL_SIZE
-						x1 = x0 + CELL_SIZE
-						y1 = y0 + CELL_SIZE
-						self.canvas.create_rectangle(x0, y0, x1, y1, fill="#e74c3c", outline="#c0392b")
-						self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text="X", fill="white", font=("Segoe UI", 9, "bold"))
+			for x, y in self.grid.iter_dynamic_positions(self.agent.t):
+				x0 = PADDING + x * CELL_SIZE
+				y0 = PADDING + y * CELL_SIZE
+				x1 = x0 + CELL_SIZE
+				y1 = y0 + CELL_SIZE
+				self.canvas.create_rectangle(x0, y0, x1, y1, fill="#e74c3c", outline="#c0392b", tags="dyn")
+				self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text="X", fill="white", font=("Segoe UI", 9, "bold"), tags="dyn")
 		# Path overlay
 		if self.show_path_var.get() and self._last_planned_path:
-			for i in range(1, len(self._last_planned_path)):
+			# Skip the part of the snapshot the agent has already walked
+			first = 1
+			if self.agent is not None:
+				first = max(1, len(self._last_planned_path) - self.agent.remaining_plan_length() + 1)
+			for i in range(first, len(self._last_planned_path)):
 				x0, y0 = self._last_planned_path[i - 1]
 				x1, y1 = self._last_planned_path[i]
 				x0p = PADDING + x0 * CELL_SIZE + CELL_SIZE // 2
 				y0p = PADDING + y0 * CELL_SIZE + CELL_SIZE // 2
 				x1p = PADDING + x1 * CELL_SIZE + CELL_SIZE // 2
 				y1p = PADDING + y1 * CELL_SIZE + CELL_SIZE // 2
-				self.canvas.create_line(x0p, y0p, x1p, y1p, fill="#8e44ad", width=3)
+				self.canvas.create_line(x0p, y0p, x1p, y1p, fill="#8e44ad", width=3, tags="dyn")
 		# Goal
 		if self.goal is not None:
 			xg, yg = self.goal
@@ -293,8 +321,8 @@ class SimulatorGUI:
 			y0 = PADDING + yg * CELL_SIZE
 			x1 = x0 + CELL_SIZE
 			y1 = y0 + CELL_SIZE
-			self.canvas.create_rectangle(x0, y0, x1, y1, fill="#3498db", outline="#1f5f85")
-			self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text="G", fill="white", font=("Segoe UI", 10, "bold"))
+			self.canvas.create_rectangle(x0, y0, x1, y1, fill="#3498db", outline="#1f5f85", tags="dyn")
+			self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text="G", fill="white", font=("Segoe UI", 10, "bold"), tags="dyn")
 		# Start
 		if self.start is not None:
 			xs, ys = self.start
@@ -302,8 +330,8 @@ class SimulatorGUI:
 			y0 = PADDING + ys * CELL_SIZE
 			x1 = x0 + CELL_SIZE
 			y1 = y0 + CELL_SIZE
-			self.canvas.create_rectangle(x0, y0, x1, y1, outline="#2ecc71", width=3)
-			self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text="S", fill="#2ecc71", font=("Segoe UI", 10, "bold"))
+			self.canvas.create_rectangle(x0, y0, x1, y1, outline="#2ecc71", width=3, tags="dyn")
+			self.canvas.create_text((x0 + x1)//2, (y0 + y1)//2, text="S", fill="#2ecc71", font=("Segoe UI", 10, "bold"), tags="dyn")
 		# Agent
 		if self.agent is not None:
 			xa, ya = self.agent.pos
@@ -311,8 +339,8 @@ class SimulatorGUI:
 			y0 = PADDING + ya * CELL_SIZE
 			x1 = x0 + CELL_SIZE
 			y1 = y0 + CELL_SIZE
-			self.canvas.create_oval(x0 + 4, y0 + 4, x1 - 4, y1 - 4, fill="#f1c40f", outline="#8a7408")
-			self.canvas.create_text(x0 + 8, y0 + 10, text=str(self.agent.t), fill="#333", font=("Segoe UI", 8))
+			self.canvas.create_oval(x0 + 4, y0 + 4, x1 - 4, y1 - 4, fill="#f1c40f", outline="#8a7408", tags="dyn")
+			self.canvas.create_text(x0 + 8, y0 + 10, text=str(self.agent.t), fill="#333", font=("Segoe UI", 8), tags="dyn")
 
 		# Status text
 		if self.agent is not None:
@@ -354,8 +382,7 @@ class SimulatorGUI:
 			if not self.grid.is_static_blocked(pos):
 				self.goal = pos
 				if self.agent is not None:
-					self.agent.goal = pos
-					self.agent._plan = []
+					self.agent.set_goal(pos)
 					self.agent.plan()
 		elif mode == MODE_SET_START:
 			if not self.grid.is_static_blocked(pos):
@@ -370,7 +397,8 @@ class SimulatorGUI:
 				# Avoid placing wall on start/goal
 				if pos != self.start and pos != self.goal:
 					self.grid.add_static_obstacle(pos)
-		self._last_planned_path = self.agent.planned_path() if self.agent is not None else []
+			self._refresh_cell(x, y)
+		self._sync_planned_path(force=True)
 		self._draw()
 
 
@@ -1,17 +1,16 @@
 from __future__ import annotations
 
 import heapq
+from array import array
 from collections import deque
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Sequence
 
 from .grid import Grid, Position
 
+HeuristicCache = List[int]
 
-@dataclass(frozen=True)
-class State:
-	pos: Position
-	t: int
+# Time steps of dynamic occupancy fetched at once by the search kernel
+OCCUPANCY_BLOCK = 16
 
 
 def manhattan(a: Position, b: Position) -> int:
@@ -20,148 +19,241 @@ def manhattan(a: Position, b: Position) -> int:
 	return abs(x1 - x2) + abs(y1 - y2)
 
 
-def reconstruct_path(parent: Dict[State, Optional[State]], end: State) -> List[Position]:
+def heuristic_table(grid: Grid, goal: Position) -> HeuristicCache:
+	"""Manhattan distance to `goal` for every cell, indexed by `y * width + x`."""
+	gx, gy = goal
+	row = [abs(x - gx) for x in range(grid.width)]
+	# Rows at the same vertical distance from the goal are identical; build each one once
+	rows: Dict[int, List[int]] = {}
+	table: List[int] = []
+	for y in range(grid.height):
+		dy = abs(y - gy)
+		shifted = rows.get(dy)
+		if shifted is None:
+			shifted = rows[dy] = [dx + dy for dx in row]
+		table += shifted
+	return table
+
+
+def reconstruct_path(parent_id: List[int], keys: List[int], end: int, width: int, idx_mask: int) -> List[Position]:
+	"""Walk `parent_id` back from state id `end`.
+
+	`keys[id]` is the packed state `((t - t0) << shift) | (y * width + x)`, with `idx_mask = (1 << shift) - 1`;
+	the parent of the start is -1.
+	"""
 	seq: List[Position] = []
-	cur: Optional[State] = end
-	while cur is not None:
-		seq.append(cur.pos)
-		cur = parent[cur]
+	cur = end
+	while cur != -1:
+		y, x = divmod(keys[cur] & idx_mask, width)
+		seq.append((x, y))
+		cur = parent_id[cur]
 	seq.reverse()
 	return seq
 
 
-def bfs(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000) -> Optional[List[Position]]:
-	"""Breadth-first search in time-expanded space with unit step costs.
-	Includes a wait action with cost 1 per time step.
+def _search(grid: Grid, start: Position, goal: Position, t0: int, max_expansions: int, costs: Sequence[int], h_table: Sequence[int], avoid_swaps: bool, carry_f: bool) -> Optional[List[Position]]:
+	"""Shared best-first kernel in time-expanded space behind `bfs`, `ucs` and `astar`.
+
+	Moving costs `costs[idx]` of the entered cell, waiting costs 1, and states are ordered by
+	g + h_table[idx]. `avoid_swaps` also rejects moves into cells occupied at the current time.
+	`carry_f` seeds successors from the popped priority instead of the stored g (UCS behavior).
 	"""
 	if grid.is_blocked(start, t0):
 		return None
-	start_state = State(start, t0)
-	frontier = deque([start_state])
-	parent: Dict[State, Optional[State]] = {start_state: None}
-	expanded = 0
-	while frontier:
-		cur = frontier.popleft()
-		if cur.pos == goal:
-			return reconstruct_path(parent, cur)
-		expanded += 1
-		if expanded > max_expansions:
+	if start == goal:
+		return [start]
+	width = grid.width
+	# Walls and bounds are folded into the neighbor table, so moves only test dynamic cells
+	open_nbrs = grid.open_neighbors()
+	# occ[dt] is the dynamic mask at t0 + dt. move_occ[dt] flags the cells a move from t0 + dt may
+	# not enter: occupied at the next step, or at either step when swaps are avoided. Both are
+	# paged in one block at a time as the search goes deeper.
+	occ = grid.build_occupancy(t0, OCCUPANCY_BLOCK)
+	if avoid_swaps:
+		move_occ = grid.build_merged_occupancy(t0, OCCUPANCY_BLOCK)
+	else:
+		move_occ = grid.build_occupancy(t0 + 1, OCCUPANCY_BLOCK)
+	# States are packed ints: ((t - t0) << shift) | (y * width + x)
+	shift = (width * grid.height - 1).bit_length()
+	idx_mask = (1 << shift) - 1
+	start_key = start[1] * width + start[0]
+	# An out-of-bounds goal would alias onto a real cell, so it gets an index no cell has
+	goal_idx = goal[1] * width + goal[0] if grid.bounds.in_bounds(goal) else -1
+	start_h = h_table[start_key]
+	# Bucket queue keyed by integer f; FIFO within a bucket matches heapq's counter tie-break
+	# and, with unit costs and no heuristic, plain BFS order. Only f values in use have a
+	# bucket and f_live is a heap of exactly those keys, so large cell costs stay cheap.
+	buckets: Dict[int, Deque[int]] = {start_h: deque((0,))}
+	f_live: List[int] = [start_h]
+	# Dense state ids: ids maps a packed state to its id; the lists below are indexed by id
+	ids: Dict[int, int] = {start_key: 0}
+	keys: List[int] = [start_key]
+	g_cost: List[int] = [0]
+	parent_id: List[int] = [-1]
+	# Bound methods hoisted out of the loop
+	ids_get = ids.get
+	keys_append = keys.append
+	g_append = g_cost.append
+	parent_append = parent_id.append
+	buckets_get = buckets.get
+	heappush = heapq.heappush
+	budget = max_expansions
+	# Cheapest goal entry queued so far (-1 if none). The goal is only ever tested here and on
+	# push: entries in a bucket pop in push order and h is consistent (no push lands below the
+	# popped f_min), so once f_min reaches goal_f this entry is the first goal state a pop would reach.
+	goal_id = -1
+	goal_f = -1
+	while f_live:
+		f_min = f_live[0]
+		if f_min == goal_f:
+			return reconstruct_path(parent_id, keys, goal_id, width, idx_mask)
+		bucket = buckets[f_min]
+		sid = bucket.popleft()
+		if not bucket:
+			del buckets[f_min]
+			heapq.heappop(f_live)
+		cur = keys[sid]
+		dt = cur >> shift
+		cur_idx = cur & idx_mask
+		cur_g = g_cost[sid]
+		# Improving a state's g re-queues it at a lower f; skip the stale entry left at the old f
+		if cur_g + h_table[cur_idx] != f_min:
+			continue
+		if carry_f:
+			cur_g = f_min
+		if not budget:
 			return None
-		next_t = cur.t + 1
-		# Wait
-		if not grid.is_blocked(cur.pos, next_t):
-			wait_state = State(cur.pos, next_t)
-			if wait_state not in parent:
-				parent[wait_state] = cur
-				frontier.append(wait_state)
+		budget -= 1
+		# Same cell field, time offset + 1
+		next_base = (cur | idx_mask) + 1
+		if dt + 1 >= len(occ):
+			t_end = t0 + len(occ)
+			occ += grid.build_occupancy(t_end, OCCUPANCY_BLOCK)
+			if avoid_swaps:
+				move_occ += grid.build_merged_occupancy(t_end, OCCUPANCY_BLOCK)
+			else:
+				move_occ += grid.build_occupancy(t_end + 1, OCCUPANCY_BLOCK)
+		occ_next = occ[dt + 1]
+		blocked = move_occ[dt]
+		# Wait (the current cell is never a wall, nor occupied at time t)
+		if not occ_next[cur_idx]:
+			ns = next_base + cur_idx
+			new_g = cur_g + 1
+			new_f = new_g + h_table[cur_idx]
+			nid = ids_get(ns)
+			if nid is None or new_g < g_cost[nid]:
+				if nid is None:
+					nid = ids[ns] = len(keys)
+					keys_append(ns)
+					g_append(new_g)
+					parent_append(sid)
+				else:
+					g_cost[nid] = new_g
+					parent_id[nid] = sid
+				bucket = buckets_get(new_f)
+				if bucket is None:
+					bucket = buckets[new_f] = deque()
+					heappush(f_live, new_f)
+				bucket.append(nid)
 		# Moves
-		for npos in grid.neighbors(cur.pos, next_t):
-			ns = State(npos, next_t)
-			if ns not in parent:
-				parent[ns] = cur
-				frontier.append(ns)
+		for idx in open_nbrs[cur_idx]:
+			if blocked[idx]:
+				continue
+			ns = next_base + idx
+			new_g = cur_g + costs[idx]
+			new_f = new_g + h_table[idx]
+			nid = ids_get(ns)
+			if nid is None or new_g < g_cost[nid]:
+				if nid is None:
+					nid = ids[ns] = len(keys)
+					keys_append(ns)
+					g_append(new_g)
+					parent_append(sid)
+				else:
+					g_cost[nid] = new_g
+					parent_id[nid] = sid
+				bucket = buckets_get(new_f)
+				if bucket is None:
+					bucket = buckets[new_f] = deque()
+					heappush(f_live, new_f)
+				bucket.append(nid)
+				if idx == goal_idx and (goal_id < 0 or new_f < goal_f):
+					if new_f == f_min:
+						# Nothing queued is cheaper and no other goal entry sits in this bucket
+						return reconstruct_path(parent_id, keys, nid, width, idx_mask)
+					goal_id = nid
+					goal_f = new_f
 	return None
 
 
-def ucs(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000) -> Optional[List[Position]]:
-	"""Uniform-cost search in time-expanded space.
-	Cost to move = cost of entering cell; cost to wait = 1.
+def _static_bfs(grid: Grid, start: Position, goal: Position, t0: int, max_expansions: int) -> Optional[List[Position]]:
+	"""Breadth-first search over cells alone, for grids with uniform costs and nothing moving.
+
+	Without moving obstacles waiting never helps, so the time dimension is dropped and each
+	cell is expanded at most once. `max_expansions` counts expanded cells.
 	"""
 	if grid.is_blocked(start, t0):
 		return None
-	start_state = State(start, t0)
-	frontier: List[Tuple[int, int, State]] = []
-	heapq.heappush(frontier, (0, 0, start_state))
-	g_cost: Dict[State, int] = {start_state: 0}
-	parent: Dict[State, Optional[State]] = {start_state: None}
-	expanded = 0
-	counter = 1
+	if start == goal:
+		return [start]
+	if not grid.bounds.in_bounds(goal):
+		return None
+	width = grid.width
+	open_nbrs = grid.open_neighbors()
+	start_idx = start[1] * width + start[0]
+	goal_idx = goal[1] * width + goal[0]
+	# parent[idx] is -1 until idx is reached; the start is its own parent
+	parent = array("i", [-1]) * (width * grid.height)
+	parent[start_idx] = start_idx
+	frontier: Deque[int] = deque([start_idx])
+	budget = max_expansions
 	while frontier:
-		cur_g, _, cur = heapq.heappop(frontier)
-		if cur.pos == goal:
-			return reconstruct_path(parent, cur)
-		expanded += 1
-		if expanded > max_expansions:
+		cur = frontier.popleft()
+		if not budget:
 			return None
-		next_t = cur.t + 1
-		# Wait
-		if not grid.is_blocked(cur.pos, next_t) and not grid.is_dynamic_blocked(cur.pos, cur.t):
-			wait_state = State(cur.pos, next_t)
-			new_g = cur_g + 1
-			h = manhattan(wait_state.pos, goal)
-			new_f = new_g + h
-			prev_g = g_cost.get(wait_state)
-			if prev_g is None or new_g < prev_g:
-				g_cost[wait_state] = new_g
-				parent[wait_state] = cur
-				heapq.heappush(frontier, (new_f, counter, wait_state))
-				counter += 1
-		# Moves
-		for npos in grid.neighbors(cur.pos, next_t):
-			if grid.is_dynamic_blocked(npos, cur.t):
+		budget -= 1
+		for idx in open_nbrs[cur]:
+			if parent[idx] != -1:
 				continue
-			move_cost = grid.get_cost(npos)
-			ns = State(npos, next_t)
-			new_g = cur_g + move_cost
-			h = manhattan(npos, goal)
-			new_f = new_g + h
-			prev_g = g_cost.get(ns)
-			if prev_g is None or new_g < prev_g:
-				g_cost[ns] = new_g
-				parent[ns] = cur
-				heapq.heappush(frontier, (new_f, counter, ns))
-				counter += 1
+			parent[idx] = cur
+			if idx == goal_idx:
+				seq: List[Position] = []
+				while idx != start_idx:
+					y, x = divmod(idx, width)
+					seq.append((x, y))
+					idx = parent[idx]
+				seq.append(start)
+				seq.reverse()
+				return seq
+			frontier.append(idx)
 	return None
 
 
-def astar(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000) -> Optional[List[Position]]:
+def bfs(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000, h_cache: Optional[HeuristicCache] = None) -> Optional[List[Position]]:
+	"""Breadth-first search in time-expanded space with unit step costs.
+	Includes a wait action with cost 1 per time step. `h_cache` is unused.
+	"""
+	cells = grid.width * grid.height
+	return _search(grid, start, goal, t0, max_expansions, array("i", [1]) * cells, [0] * cells, False, False)
+
+
+def ucs(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000, h_cache: Optional[HeuristicCache] = None) -> Optional[List[Position]]:
+	"""Uniform-cost search in time-expanded space.
+	Cost to move = cost of entering cell; cost to wait = 1.
+	"""
+	if grid.is_uniform_cost and not grid.has_dynamic_obstacles:
+		# Every move costs the same and nothing moves, so the fewest moves is the cheapest path
+		return _static_bfs(grid, start, goal, t0, max_expansions)
+	if h_cache is None:
+		h_cache = heuristic_table(grid, goal)
+	return _search(grid, start, goal, t0, max_expansions, grid.cost_array(), h_cache, True, True)
+
+
+def astar(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000, h_cache: Optional[HeuristicCache] = None) -> Optional[List[Position]]:
 	"""A* in time-expanded space with Manhattan heuristic.
 	Heuristic ignores time and dynamic obstacles; it is admissible if all costs >= 1.
+	`h_cache` may be shared across calls with the same goal (see `heuristic_table`).
 	"""
-	if grid.is_blocked(start, t0):
-		return None
-	start_state = State(start, t0)
-	frontier: List[Tuple[int, int, State]] = []
-	start_h = manhattan(start, goal)
-	heapq.heappush(frontier, (start_h, 0, start_state))
-	g_cost: Dict[State, int] = {start_state: 0}
-	parent: Dict[State, Optional[State]] = {start_state: None}
-	expanded = 0
-	counter = 1
-	while frontier:
-		cur_f, _, cur = heapq.heappop(frontier)
-		cur_g = g_cost[cur]
-		if cur.pos == goal:
-			return reconstruct_path(parent, cur)
-		expanded += 1
-		if expanded > max_expansions:
-			return None
-		next_t = cur.t + 1
-		# Wait
-		if not grid.is_blocked(cur.pos, next_t):
-			wait_state = State(cur.pos, next_t)
-			new_g = cur_g + 1
-			h = manhattan(wait_state.pos, goal)
-			new_f = new_g + h
-			prev_g = g_cost.get(wait_state)
-			if prev_g is None or new_g < prev_g:
-				g_cost[wait_state] = new_g
-				parent[wait_state] = cur
-				heapq.heappush(frontier, (new_f, counter, wait_state))
-				counter += 1
-		# Moves
-		for npos in grid.neighbors(cur.pos, next_t):
-			if grid.is_dynamic_blocked(npos, cur.t):
-				continue
-			move_cost = grid.get_cost(npos)
-			ns = State(npos, next_t)
-			new_g = cur_g + move_cost
-			h = manhattan(npos, goal)
-			new_f = new_g + h
-			prev_g = g_cost.get(ns)
-			if prev_g is None or new_g < prev_g:
-				g_cost[ns] = new_g
-				parent[ns] = cur
-				heapq.heappush(frontier, (new_f, counter, ns))
-				counter += 1
-	return None 
\ No newline at end of file
+	if h_cache is None:
+		h_cache = heuristic_table(grid, goal)
+	return _search(grid, start, goal, t0, max_expansions, grid.cost_array(), h_cache, True, False)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import List, Optional, Tuple
+
+from .grid import Grid, Position
+from . import search as search_mod
+
+# g_cost value for cells not reached yet
+_UNSEEN = 2 ** 31 - 1
+
+# Cells are packed as (y + 1) * pw + (x + 1) with pw = width + 2: a one-cell border of
+# blocked cells around the grid makes every probe a single byte load with no bounds check.
+
+
+def _padded_open(grid: Grid) -> bytearray:
+	"""Per-cell open flags (1 = free) in the padded layout, border cells blocked."""
+	width = grid.width
+	pw = width + 2
+	_, walls = grid.to_arrays()
+	free = walls.translate(bytes((1, 0)) + bytes(254))
+	open_ = bytearray(pw * (grid.height + 2))
+	for y in range(grid.height):
+		p = (y + 1) * pw + 1
+		open_[p:p + width] = free[y * width:(y + 1) * width]
+	return open_
+
+
+def _jump(p: int, d: int, pw: int, free: bytearray, goal: int) -> int:
+	"""Walk from p in step d (±1 or ±pw); return the first jump point or -1.
+
+	A cell is a jump point if it is the goal or has a forced neighbor. Vertical
+	walks also stop where a horizontal walk would find a jump point.
+	"""
+	if d == 1 or d == -1:
+		while True:
+			p += d
+			if not free[p]:
+				return -1
+			if p == goal:
+				return p
+			if (free[p - pw] and not free[p - d - pw]) or (free[p + pw] and not free[p - d + pw]):
+				return p
+	while True:
+		p += d
+		if not free[p]:
+			return -1
+		if p == goal:
+			return p
+		if (free[p - 1] and not free[p - 1 - d]) or (free[p + 1] and not free[p + 1 - d]):
+			return p
+		if _jump(p, 1, pw, free, goal) != -1 or _jump(p, -1, pw, free, goal) != -1:
+			return p
+
+
+def _directions(p: int, parent: int, pw: int) -> Tuple[int, ...]:
+	"""Pruned 4-connected search steps when arriving at p from parent (-1 for the start)."""
+	if parent == -1:
+		return (1, -1, pw, -pw)
+	diff = p - parent
+	if -pw < diff < pw:
+		return (-pw, pw, 1 if diff > 0 else -1)
+	return (-1, 1, pw if diff > 0 else -pw)
+
+
+def _expand_path(parent: array, end: int, pw: int) -> List[Position]:
+	"""Rebuild the cell-by-cell path from the jump point chain ending at packed cell `end`."""
+	points: List[Position] = []
+	cur = end
+	while cur != -1:
+		y, x = divmod(cur, pw)
+		points.append((x - 1, y - 1))
+		cur = parent[cur]
+	points.reverse()
+	seq: List[Position] = [points[0]]
+	for x1, y1 in points[1:]:
+		x, y = seq[-1]
+		dx = (x1 > x) - (x1 < x)
+		dy = (y1 > y) - (y1 < y)
+		while (x, y) != (x1, y1):
+			x += dx
+			y += dy
+			seq.append((x, y))
+	return seq
+
+
+def jps(grid: Grid, start: Position, goal: Position, t0: int = 0, max_expansions: int = 200000, h_cache: Optional[search_mod.HeuristicCache] = None) -> Optional[List[Position]]:
+	"""Jump Point Search for 4-connected grids with uniform costs and no moving obstacles.
+
+	Falls back to `search.astar` when the grid has varying costs or dynamic obstacles.
+	`max_expansions` counts expanded jump points.
+	"""
+	if not grid.is_uniform_cost or grid.has_dynamic_obstacles:
+		return search_mod.astar(grid, start, goal, t0, max_expansions, h_cache=h_cache)
+	if grid.is_blocked(start, t0):
+		return None
+	if start == goal:
+		return [start]
+	pw = grid.width + 2
+	free = _padded_open(grid)
+	gx, gy = goal
+	goal_p = (gy + 1) * pw + gx + 1 if grid.bounds.in_bounds(goal) else -1
+	start_p = (start[1] + 1) * pw + start[0] + 1
+	# Per-cell search state in the padded layout; the parent of the start is -1
+	g_cost = array("i", [_UNSEEN]) * len(free)
+	parent = array("i", [-1]) * len(free)
+	closed = bytearray(len(free))
+	g_cost[start_p] = 0
+	# Heap items are (f, packed cell); cells are unique per jump point, so no tie-break counter
+	frontier: List[Tuple[int, int]] = [(abs(start[0] - gx) + abs(start[1] - gy), start_p)]
+	expanded = 0
+	while frontier:
+		_, p = heapq.heappop(frontier)
+		if closed[p]:
+			continue
+		if p == goal_p:
+			return _expand_path(parent, p, pw)
+		closed[p] = 1
+		expanded += 1
+		if expanded > max_expansions:
+			return None
+		cur_g = g_cost[p]
+		for d in _directions(p, parent[p], pw):
+			j = _jump(p, d, pw, free, goal_p)
+			if j == -1 or closed[j]:
+				continue
+			dist = j - p if j > p else p - j
+			new_g = cur_g + (dist if dist < pw else dist // pw)
+			if new_g < g_cost[j]:
+				g_cost[j] = new_g
+				parent[j] = p
+				jy, jx = divmod(j, pw)
+				heapq.heappush(frontier, (new_g + abs(jx - 1 - gx) + abs(jy - 1 - gy), j))
+	return None
@@ -12,36 +12,29 @@ from delivery import search as search_mod
 
 
 def build_random_grid(width: int, height: int, seed: int) -> Grid:
-	random.seed(seed)
+	rng = random.Random(seed)
 	grid = Grid(width, height, default_cost=1)
-	# Random terrain costs 1..5
-	for y in range(height):
-		for x in range(width):
-			grid.set_cost((x, y), random.randint(1, 5))
-	# Place static obstacles ~10%
-	static: List[Position] = []
-	for y in range(height):
-		for x in range(width):
-			if random.random() < 0.10:
-				static.append((x, y))
-	grid.set_static_obstacles(static)
+	n = width * height
+	# Row-major terrain costs 1..5 and ~10% static obstacles, filled in bulk
+	grid.set_costs_bulk(rng.choices(range(1, 6), k=n))
+	grid.set_static_obstacles_mask([rng.random() < 0.10 for _ in range(n)])
 	return grid
 
 
 def add_dynamic_obstacles(grid: Grid, width: int, height: int, seed: int) -> None:
-	random.seed(seed + 1)
+	rng = random.Random(seed + 1)
 	num = max(1, (width * height) // 60)
 	for i in range(num):
 		# Horizontal or vertical patrols
-		if random.random() < 0.5:
-			y = random.randint(0, height - 1)
+		if rng.random() < 0.5:
+			y = rng.randint(0, height - 1)
 			path = [(x, y) for x in range(width)]
-			if random.random() < 0.5:
+			if rng.random() < 0.5:
 				path.reverse()
 		else:
-			x = random.randint(0, width - 1)
+			x = rng.randint(0, width - 1)
 			path = [(x, y) for y in range(height)]
-			if random.random() < 0.5:
+			if rng.random() < 0.5:
 				path.reverse()
 		grid.add_dynamic_obstacle(MovingObstacle(path=path, cycle=True))
 
@@ -75,16 +68,15 @@ def run(args: argparse.Namespace) -> int:
 
 	agent = DeliveryAgent(grid, start, goal, AgentConfig(algo=algo, random_seed=seed))
 
-	print(f"Grid {width}x{height}, algo={algo}, seed={seed}")
-	print(grid.render(agent.pos, goal, agent.t))
-	print()
+	# Walls, costs and the goal never change during the run; frames only overlay moving parts
+	base = grid.render_base(goal)
+	write = sys.stdout.write
+	write(f"Grid {width}x{height}, algo={algo}, seed={seed}\n{grid.render(agent.pos, goal, agent.t, base)}\n\n")
 
 	for step in range(1, max_steps + 1):
 		ok = agent.step()
 		if step % print_every == 0 or agent.at_goal() or not ok:
-			print(f"t={agent.t} pos={agent.pos} goal={goal} ok={ok}")
-			print(grid.render(agent.pos, goal, agent.t))
-			print()
+			write(f"t={agent.t} pos={agent.pos} goal={goal} ok={ok}\n{grid.render(agent.pos, goal, agent.t, base)}\n\n")
 		if not ok:
 			print("Agent stuck; exiting.")
 			return 2
@@ -96,7 +88,7 @@ def run(args: argparse.Namespace) -> int:
 
 def parse_args(argv: List[str]) -> argparse.Namespace:
 	parser = argparse.ArgumentParser(description="Autonomous Delivery Agent Simulator")
-	parser.add_argument("--algo", choices=["bfs", "ucs", "astar"], default="astar")
+	parser.add_argument("--algo", choices=["bfs", "ucs", "astar", "jps"], default="astar")
 	parser.add_argument("--width", type=int, default=20)
 	parser.add_argument("--height", type=int, default=12)
 	parser.add_argument("--seed", type=int, default=7)